@@ -6,10 +6,28 @@ This is the main module which contains the Airfoil class.
 import numpy as np
 import scipy.interpolate as sp
 import matplotlib.pyplot as plt
-import math
+import os
+try:                                                                                                                     # Optional JIT compiler for the Hermite interpolation kernel
+	from numba import njit
+except ImportError:
+	njit = None
 
 # IMPORT INTERNAL MODULES #
 import uiuc
+import uiuc_cache
+
+
+
+plt.style.use(['dark_background', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aerofoil.mplstyle')])        # Apply .mplystyle custom styles once at import
+
+
+
+# (x,y) end-points shared by the suction and pressure surfaces of every parsed Airfoil
+_LE = np.array([[0.0], [0.0]])                                                                                           # Leading edge
+_TE = np.array([[1.0], [0.0]])                                                                                           # Trailing edge
+
+# Power series (pnl_rule)^i where 0<i<n_pnls-1 keyed on (pnl_rule, n_pnls) -> reused by every splineInterpolation call
+_POW_CACHE = {}
 
 
 
@@ -19,16 +37,14 @@ import uiuc
 #                     multiple tuples may be supplied to plot suction and pressure surfaces separately
 def plot(code, *args):
 
-		plt.figure(figsize=(20, 10),                                                                             # Figure dimensions (width [in], height [in]) 
-		           dpi=80,                                                                                       # Figure resolution
-		           facecolor='black')                                                                            # Figure (not axes) background color
-
-		plt.style.use(['dark_background', './aerofoil.mplstyle'])                                                # Apply .mplystyle custom styles
+		fig, ax = plt.subplots(figsize=(20, 10),                                                                 # Figure dimensions (width [in], height [in]) 
+		                       dpi=80,                                                                           # Figure resolution
+		                       facecolor='black')                                                                # Figure (not axes) background color
 		
 		colours = ["blue", "red"]
 		for i,data_set in enumerate(args):                                                                       # Loop through input data-sets
-			plt.plot(data_set[0], data_set[1], "x", color=colours[i])                                        # Plot current data set
-		plt.axis('equal')                                                                                        # Set equal x,y axis ranges
+			ax.plot(data_set[0], data_set[1], "x", color=colours[i])                                         # Plot current data set
+		ax.axis('equal')                                                                                         # Set equal x,y axis ranges
 
 		# # FOR TESTING/DEBUGGING PURPOSES ONLY - Airfoil.plot(...)#
 		# for data_set in args:
@@ -37,7 +53,6 @@ def plot(code, *args):
 		# 		plt.pause(1)
 		# print("DONE PLOTTING...")
 
-		ax = plt.gca()                                                                                           # Get axes object
 		ax.spines['right'].set_visible(False)                                                                    # Switch off the right plot border
 		ax.spines['top'].set_visible(False)                                                                      # Switch off the top plot border
 		
@@ -48,33 +63,113 @@ def plot(code, *args):
 
 
 
+# --- SORT A SINGLE AIRFOIL SURFACE AND OVERWRITE ITS END-POINTS --- #
+# @xy     -> Array: 2xN (x,y) coordinates of one distinct airfoil surface
+# @return -> Array: 2xN (x,y) coordinates in ascending x order from LE (0.0, 0.0) to TE (1.0, 0.0)
+def _parseSurface(xy):
+
+	order = np.argsort(xy[0], kind="stable")[1:-1]                                                                   # Indices of interior points in ascending x order -> drop end-points
+	return np.concatenate((_LE, xy[:, order], _TE), axis=1)                                                          # Gather x and y in one step -> Overwrite end-points
+
+
+
+# --- JOIN SUCTION AND PRESSURE SURFACES TO A COMPLETE AIRFOIL --- #
+# @x_s, y_s -> Array:      Suction surface (x,y) coordinates from LE to TE
+# @x_p, y_p -> Array:      Pressure surface (x,y) coordinates from LE to TE
+# @return   -> Dictionary: Airfoil coordinates -> all values are views into a single 2xN array "xy"
+def _joinSurfaces(x_s, y_s, x_p, y_p):
+
+	# Write suction and pressure surfaces to a single array to obtain (x,y) coordinates of 
+	# complete Airfoil in counterclockwise order starting from TE
+	# N.B. First and last points both have coordinates (xTE, yTE) - no other duplicates
+	i_le = len(x_p) - 1                                                                                              # Index of LE point shared by both surfaces
+	xy = np.empty((2, i_le + len(x_s)))                                                                              # Struct-of-arrays storage: row 0 -> x, row 1 -> y
+	xy[0, :i_le], xy[1, :i_le] = x_p[:0:-1], y_p[:0:-1]                                                              # Pressure surface from TE up to (excl.) LE
+	xy[0, i_le:], xy[1, i_le:] = x_s, y_s                                                                            # Suction surface from LE to TE
+
+	return {"xy": xy, "x": xy[0], "y": xy[1],
+	        "x_suction": xy[0, i_le:], "y_suction": xy[1, i_le:],
+	        "x_pressure": xy[0, i_le::-1], "y_pressure": xy[1, i_le::-1]}
+
+
+
 # --- PARSE RAW AIRFOIL COORDINATES TO CONSISTENT FORMAT --- #
 # @x -> List: x-coordinates as received from uiuc.requestAirfoilCoordinates
 # @y -> List: y-coordinates as received from uiuc.requestAirfoilCoordinates
 def parseCoordinates(x, y):
 
-	temp = np.argsort(x)                                                                                             # Indices that WOULD sort x-coordinates in ascending order
-	limits_surf1 = sorted([min(temp[:2]), min(temp[-2:])])                                                           # (x,y) indices spanning one of the distinct airfoil surfaces
-	limits_surf2 = sorted([max(temp[:2]), max(temp[-2:])])                                                           # (x,y) indices spanning the other distinct airfoil surface
-	x1, y1 = x[limits_surf1[0]:limits_surf1[1] + 1], y[limits_surf1[0]:limits_surf1[1] + 1]                          # (x,y) coordinates of one of the distinct airfoil surfaces
-	x2, y2 = x[limits_surf2[0]:limits_surf2[1] + 1], y[limits_surf2[0]:limits_surf2[1] + 1]                          # (x,y) coordinates of the other distinct airfoil surface
+	xy = np.array((x, y), dtype=np.float64)                                                                          # Stack raw coordinates to a single 2xN array
+	temp = np.argsort(xy[0], kind="stable")                                                                          # Indices that WOULD sort x-coordinates in ascending order
+	ends = np.sort(np.vstack((temp[:2], temp[-2:])), axis=1)                                                         # Row 0: indices of the two LE-most points, Row 1: two TE-most points
+	limits_surf1 = np.sort(ends[:, 0])                                                                               # (x,y) indices spanning one of the distinct airfoil surfaces
+	limits_surf2 = np.sort(ends[:, 1])                                                                               # (x,y) indices spanning the other distinct airfoil surface
+	xy1 = xy[:, limits_surf1[0]:limits_surf1[1] + 1]                                                                 # (x,y) coordinates of one of the distinct airfoil surfaces
+	xy2 = xy[:, limits_surf2[0]:limits_surf2[1] + 1]                                                                 # (x,y) coordinates of the other distinct airfoil surface
+
+	i_top = np.argmax(xy[1])                                                                                         # Index of uppermost point -> lies on suction surface
+	if limits_surf1[0] <= i_top <= limits_surf1[1]:                                                                  # Determine if surface is suction or pressure
+		x_s, y_s = _parseSurface(xy1)                                                                            # Extract suction coordinates -> Overwrite end-points
+		x_p, y_p = _parseSurface(xy2)                                                                            # Extract pressure coordinates -> Overwrite end points
+	else:
+		x_s, y_s = _parseSurface(xy2)
+		x_p, y_p = _parseSurface(xy1)
+
+	return _joinSurfaces(x_s, y_s, x_p, y_p)                                                                         # All values of returned dictionary are arrays
+
+
+
+# --- END-POINT SLOPE OF A SHAPE-PRESERVING PIECEWISE CUBIC HERMITE INTERPOLANT --- #
+# @h0, h1 -> Float: Lengths of the first and second intervals counted from the end-point
+# @m0, m1 -> Float: Gradients of the first and second intervals counted from the end-point
+# @return -> Float: Slope at the end-point (non-centered three-point estimate)
+def _pchipEndSlope(h0, h1, m0, m1):
+
+	d = ((2.0*h0 + h1)*m0 - h0*m1) / (h0 + h1)
+	if np.sign(d) != np.sign(m0):                                                                                    # Slope opposes adjacent gradient -> flatten
+		return 0.0
+	if np.sign(m0) != np.sign(m1) and abs(d) > 3.0*abs(m0):                                                          # Limit overshoot next to a local extremum
+		return 3.0*m0
+	return d
+
+
+
+# --- PIECEWISE CUBIC HERMITE INTERPOLATION OF A SINGLE AIRFOIL SURFACE --- #
+# @xs     -> Array: Strictly ascending x-coordinates of the airfoil surface
+# @ys     -> Array: y-coordinates of the airfoil surface
+# @x      -> Array: x-coordinates at which to interpolate the surface
+# @return -> Array: Interpolated y-coordinates
+# N.B. Slopes match scipy.interpolate.PchipInterpolator - compiled with numba if available
+def _hermiteKernel(xs, ys, x):
+
+	h = xs[1:] - xs[:-1]                                                                                             # Interval lengths
+	m = (ys[1:] - ys[:-1]) / h                                                                                       # Interval gradients
 
-	if max(y1) > max(y2):                                                                                            # Determine if surface is suction or pressure																						
-		x_s, y_s = list(zip(* [(0.0, 0.0)] + sorted(list(zip(x1, y1)))[1:-1] + [(1.0, 0.0)] ))                   # Extract suction coordinates -> Overwrite end-points				
-		x_p, y_p = list(zip(* [(0.0, 0.0)] + sorted(list(zip(x2, y2)))[1:-1] + [(1.0, 0.0)] ))                   # Extract pressure coordinates -> Overwrite end points
+	d = np.zeros(xs.size)                                                                                            # Slopes at data points -> zero at local extrema and flat intervals
+	if xs.size == 2:                                                                                                 # Single interval -> linear interpolation
+		d[:] = m[0]
 	else:
-		x_s, y_s = list(zip(* [(0.0, 0.0)] + sorted(list(zip(x2, y2)))[1:-1] + [(1.0, 0.0)] ))
-		x_p, y_p = list(zip(* [(0.0, 0.0)] + sorted(list(zip(x1, y1)))[1:-1] + [(1.0, 0.0)] ))
+		k = np.nonzero(m[:-1]*m[1:] > 0.0)[0]                                                                    # Interior points between intervals of equal gradient sign
+		w1 = 2.0*h[k + 1] + h[k]
+		w2 = h[k + 1] + 2.0*h[k]
+		d[k + 1] = (w1 + w2) / (w1/m[k] + w2/m[k + 1])                                                           # Weighted harmonic mean of adjacent gradients
+		d[0] = _pchipEndSlope(h[0], h[1], m[0], m[1])
+		d[-1] = _pchipEndSlope(h[-1], h[-2], m[-1], m[-2])
+
+	i = np.searchsorted(xs, x, side="right") - 1                                                                     # Index of interval containing each x -> O(log n) lookup
+	i = np.minimum(np.maximum(i, 0), xs.size - 2)                                                                    # Clamp to first/last interval (extrapolation)
+	dx = h[i]
+	t = (x - xs[i]) / dx                                                                                             # Normalised position in interval
+	t2 = t*t
+	t3 = t2*t
+
+	return ((2.0*t3 - 3.0*t2 + 1.0)*ys[i] + (t3 - 2.0*t2 + t)*dx*d[i]                                                # Hermite basis h00, h10, h01, h11
+	        + (3.0*t2 - 2.0*t3)*ys[i + 1] + (t3 - t2)*dx*d[i + 1])
+
 
-	# Concatenate suction and pressure surfaces to obtain (x,y) coordinates of 
-	# complete Airfoil in counterclockwise order starting from TE
-	# N.B. First and last points both have coordinates (xTE, yTE) - no other duplicates
-	x_c = x_p[::-1][:-1] + x_s
-	y_c = y_p[::-1][:-1] + y_s
 
-	return {"x": list(x_c), "y": list(y_c),                                                                          # All values of returned dictionary are lists
-			"x_suction": list(x_s), "y_suction": list(y_s),
-			"x_pressure": list(x_p), "y_pressure": list(y_p)}
+if njit is not None:
+	_pchipEndSlope = njit(cache=True)(_pchipEndSlope)
+	_hermiteKernel = njit(cache=True)(_hermiteKernel)
 
 
 
@@ -85,51 +180,67 @@ def parseCoordinates(x, y):
 # 						     with unit diameter
 # @pnl_rule   -> Float:      Fraction by which interval length decreases for each interval
 # 						     (along chord or circle dependent on @pnl_scheme)
-def splineInterpolation(coords, n, pnl_scheme, pnl_rule):
+# @spline     -> String:     Whether to use a clamped C2 cubic spline ("cubic") or a local
+# 						     C1 piecewise cubic Hermite interpolant ("hermite") - no linear solve
+def splineInterpolation(coords, n, pnl_scheme, pnl_rule, spline="cubic"):
 	
 	n_pnls = int(n/2) - 1                                                                                            # Num. of intervals (panels) is one less num. of points 
-	sum_series = np.sum(np.repeat(pnl_rule, n_pnls)**np.linspace(0, n_pnls - 1, n_pnls))                             # Sum of power series (pnl_rule)^i where 0<i<n_pnls-1
+	sum_series = n_pnls if pnl_rule == 1.0 else (1.0 - pnl_rule**n_pnls) / (1.0 - pnl_rule)                          # Closed-form sum of power series (pnl_rule)^i where 0<i<n_pnls-1
+	powers = _POW_CACHE.get((pnl_rule, n_pnls))                                                                      # Power series (pnl_rule)^i where 0<i<n_pnls-1
+	if powers is None:
+		powers = pnl_rule**np.arange(n_pnls)
+		powers.flags.writeable = False                                                                           # Shared between calls -> read-only
+		_POW_CACHE[(pnl_rule, n_pnls)] = powers
 	if pnl_scheme == "chord":                                                                                        # Sample x-coordinates along Airfoil chord line
 		delta_max = 1 / sum_series                                                                               # Length of maximum length interval
-		delta = delta_max*pnl_rule**(n_pnls - np.linspace(1, n_pnls, n_pnls))                                    # Length of intervals
-		x = np.insert(np.cumsum(delta), 0, 0)                                                                    # Sampled x-coordinates
+		delta = delta_max*powers[::-1]                                                                           # Length of intervals
+		x = np.empty(n_pnls + 1)                                                                                 # Pre-allocate sampled x-coordinates
+		x[0] = 0.0
+		np.cumsum(delta, out=x[1:])                                                                              # Sampled x-coordinates
 	else:                                                                                                            # Sample x-coordinates along circle with unit diameter
-		delta_max = math.pi / sum_series
-		delta = delta_max*pnl_rule**(np.linspace(1, n_pnls, n_pnls) - 1)
-		x = np.flip(0.5 + 0.5*np.cos(np.insert(np.cumsum(delta), 0, 0)), axis=0)
-
-	coords_interp = {}                                                                                               # Initialise empty dictionary for airfoil coordinates
+		delta_max = np.pi / sum_series
+		delta = delta_max*powers
+		angles = np.empty(n_pnls + 1)                                                                            # Pre-allocate angles along circle
+		angles[0] = 0.0
+		np.cumsum(delta, out=angles[1:])
+		np.cos(angles, out=angles)                                                                               # Project angles onto chord line in place
+		angles *= 0.5
+		angles += 0.5
+		x = angles[::-1]                                                                                         # Sampled x-coordinates (reversed view - no copy)
+
+	y_interp = {}                                                                                                    # Initialise empty dictionary for interpolated y-coordinates
 	
 	for suffix in ("suction", "pressure"):                                                                           # Loop through suction and pressure surfaces
-		f = sp.CubicSpline(coords["x_" + suffix], coords["y_" + suffix], bc_type="clamped", extrapolate=None)    # Spline interpolation function
-		y = f(x)                                                                                                 # Interpolated y-coordinates
-		coords_interp["x_" + suffix] = list(x)                                                                   # Cast interpolated x-coordinate array to list -> Update dict.
-		coords_interp["y_" + suffix] = list(y)                                                                   # Cast interpolated y-coordinate array to list -> Update dict.
-
-	# Concatenate interpolated suction and pressure surfaces to obtain interpolated 
-	# (x,y) coordinates of complete Airfoil in counterclockwise order starting from TE
-	# N.B. First and last points both have coordinates (xTE, yTE) - no other duplicates
-	coords_interp["x"] = coords_interp["x_pressure"][::-1][:-1] + coords_interp["x_suction"]                   
-	coords_interp["y"] = coords_interp["y_pressure"][::-1][:-1] + coords_interp["y_suction"]
+		xs, ys = coords["x_" + suffix], coords["y_" + suffix]
+		if spline == "hermite":                                                                                  # Local C1 interpolation -> JIT-compiled if numba is available
+			y = _hermiteKernel(np.ascontiguousarray(xs, dtype=np.float64),
+			                   np.ascontiguousarray(ys, dtype=np.float64),
+			                   np.ascontiguousarray(x, dtype=np.float64))
+		else:
+			f = sp.make_interp_spline(xs, ys, k=3, bc_type=([(1, 0.0)], [(1, 0.0)]))                         # Clamped cubic B-spline - zero first derivative at both ends
+			y = f(x)                                                                                         # Interpolated y-coordinates
+		y_interp[suffix] = y                                                                                     # Update dict.
 
-	return coords_interp                                                                                             # All values of returned dictionary are lists					
+	return _joinSurfaces(x, y_interp["suction"], x, y_interp["pressure"])                                            # All values of returned dictionary are arrays
 
 
 
 # --- AIRFOIL API --- #
 class Airfoil:
 
-	def __init__(self, code, fetchfrom="online"):
+	def __init__(self, code, fetchfrom="cache"):
 		if fetchfrom == "online":                                                                                # Fetch airfoil coordinates directly from online DB
 			airfoil = uiuc.requestAirfoilCoordinates(code)
+		elif fetchfrom == "cache":                                                                               # Fetch airfoil coordinates from local cache -> online DB on cache miss
+			airfoil = uiuc_cache.requestAirfoilCoordinates(code)
 		self.code = code
 		self.xraw = airfoil["x"]
 		self.yraw = airfoil["y"]
 		self.coordinates = parseCoordinates(self.xraw, self.yraw)
 
 
-	def splineInterpolation(self, n=100, pnl_scheme="chord", pnl_rule=0.9):
-		self.coordinates = splineInterpolation(self.coordinates, n, pnl_scheme, pnl_rule)
+	def splineInterpolation(self, n=100, pnl_scheme="chord", pnl_rule=0.9, spline="cubic"):
+		self.coordinates = splineInterpolation(self.coordinates, n, pnl_scheme, pnl_rule, spline)
 
 
 	def plot(self, sep="y"):
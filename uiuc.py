@@ -4,37 +4,44 @@ the UIUC online Airfoil database.
 """
 
 # IMPORT EXTERNAL MODULES #
-from urllib.request import urlopen																		
-from bs4 import BeautifulSoup																			
-from urllib.error import HTTPError																		
+from collections import defaultdict
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+import requests
+import io
 import re 																								
 
 
 
+_SESSION = requests.Session()                                                                               # Shared HTTP session -> keep-alive connections are reused across requests
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64,                                # Connection pool sized for concurrent downloads (see uiuc_clone)
+                                       max_retries=Retry(total=3, backoff_factor=0.3)))                     # Retry failed connections with backoff
+_HREF_RE = re.compile(rb"coord/([A-Za-z0-9_]+)\.dat")                                                       # Compiled regex matching "coord/{airfoil-code}.dat" hrefs -> captures airfoil code
+
+
+
 # --- GENERATE A DICTIONARY/KEY/INDEX OF ALL AIRFOILS IN THE UIUC DATABASE --- #
 # @return -> Dictionary: Mapping from lowercase alphabetic char to list (of strings) 
 #                        of all airfoils whose codes begin with that letter
 def requestAirfoilIndex():
-	# REQUEST AND STORE STRINGIFIED HTML FILE #
+	# REQUEST AND STORE RAW HTML FILE #
 	url_index = "https://m-selig.ae.illinois.edu/ads/coord_database.html"                               # URL string to index page on UIUC website
-	html = urlopen(url_index)                                                                           # Open socket connection to html page containing airfoil codes
-	dom = BeautifulSoup(html, 'html.parser')                                                            # Parse the html page to bs4's DOM object
-	html.close()                                                                                        # Close socket connection
+	response = _SESSION.get(url_index, timeout=10)                                                      # GET html page containing airfoil codes (gzip-encoded by default)
+	response.raise_for_status()                                                                         # Raise HTTPError in case of an unsuccessful request
 
 	# FILTER REQUESTED PAGE FOR AIRFOIL CODES #
-	airfoil_tags = dom.findAll("a", {"href": re.compile("coord/[a-zA-Z0-9_]*(.dat)")})                  # List of stringified html tags whose href attribute matches
-	                                                                                                    # the following regex: "coord/{airfoil-code}.dat
-    # PARSE AIRFOIL CODES #
-	codes = {"a": [], "b": [], "c": [], "d": [], "e": [], "f": [], "g": [], "h": [],                    # Intialise dictionary to store airfoil codes alphabetically
-			 "i": [], "j": [], "k": [], "l": [], "m": [], "n": [], "o": [], "p": [],
-			 "q": [], "r": [], "s": [], "t": [], "u": [], "v": [], "w": [], "x": [],
-			 "y": [], "z": [], "numeric": []}
+	codes_raw = _HREF_RE.findall(response.content)                                                      # List of airfoil codes whose href matches the following regex: "coord/{airfoil-code}.dat"
+	                                                                                                    # -> single scan over raw bytes, no DOM
+	# PARSE AIRFOIL CODES #
+	codes = defaultdict(list)                                                                           # Intialise dictionary to store airfoil codes alphabetically
 
-	for tag in airfoil_tags:                                                                            # Loop through stringified html tags
-		code = tag.get_text()[:-4].replace(" ", "")                                                 # Extract the text content from the html tag and remove .dat extension
-		codes[code[0].lower() if code[0].isalpha() else "numeric"].append(code)                     # Append airfoil code to @codes dictionary
+	for code_raw in codes_raw:                                                                          # Loop through raw airfoil codes
+		code = code_raw.decode("ascii")                                                             # Decode airfoil code (regex matches ASCII only)
+		codes[code[0].lower() if code[:1].isalpha() else "numeric"].append(code)                    # Append airfoil code to @codes dictionary
 
-	return codes                                                                                        # Return dictionary of airfoil codes
+	return dict(codes)                                                                                  # Return dictionary of airfoil codes
 
 
 
@@ -42,17 +49,38 @@ def requestAirfoilIndex():
 # @code    -> String: Airfoil Code
 # @return  -> Dictionary: Lists of airfoil x,y coordinates
 def requestAirfoilCoordinates(code):
+	coords = _requestAirfoilCoordinates(code)                                                           # Cached request -> network is only hit once per airfoil code
+	if coords is None:                                                                                  # HTTP error (most likely 404)
+		return {}
+	return {"code": code, "x": list(coords[0]), "y": list(coords[1])}                                   # Fresh dictionary per call -> safe to mutate (e.g. MongoDB "_id")
+
+
+
+# --- SCRAPE AND CACHE IMMUTABLE AIRFOIL COORDINATES FROM UIUC DATABASE --- #
+# @code    -> String: Airfoil Code
+# @return  -> Tuple: Tuples of airfoil x,y coordinates - None in case of an HTTP error
+@lru_cache(maxsize=2048)
+def _requestAirfoilCoordinates(code):
 	# REQUEST AND STORE STRINGIFIED .dat file #
 	url_coords = "https://m-selig.ae.illinois.edu/ads/coord/"                                           # URL string to airfoil coordinates .dat file - must append {airfoil-code}.dat
+	response = _SESSION.get(url_coords + code + ".dat", timeout=10)                                     # GET .dat file containing airfoil coordinates
+	if not response.ok:                                                                                 # Exit function in case of an HTTP error (most likely 404)
+		return None
+	coords_bytes = response.content                                                                     # Raw byte-stream of .dat file
+
+	# PARSE AIRFOIL COORDINATES (COMPILED) #
 	try:
-		dat = urlopen(url_coords + code + ".dat")                                                   # Open socket connection to .dat file containing airfoil coordinates
-	except HTTPError:                                                                                   # Exit function in case of an HTTP error (most likely 404)
-		return {}
+		arr = np.genfromtxt(io.BytesIO(coords_bytes), skip_header=1, usecols=(0, 1),                # Parse first 2 columns of each line to Nx2 array -> skip title
+		                    invalid_raise=False, dtype=np.float64, encoding="latin-1")              # Skip lines with too few columns instead of raising
+		mask = (np.abs(arr[:, 0]) <= 2.0) & (np.abs(arr[:, 1]) <= 2.0)                              # Ignore numeric headers e.g. "17.0		17.0" and non-numeric lines (NaN)
+		return tuple(arr[mask, 0].tolist()), tuple(arr[mask, 1].tolist())                           # Return tuples of airfoil coordinates
+	except (ValueError, IndexError):                                                                    # Fall back to line-by-line parsing (e.g. less than 2 coordinate lines)
+		pass
+
 	try:
-		coords_str = dat.read().decode("utf8")                                                      # Read byte-stream and decode to string
+		coords_str = coords_bytes.decode("utf8")                                                    # Decode byte-stream to string
 	except UnicodeDecodeError:
-		coords_str = b"".join(dat.readlines()[1:]).decode("utf8")                                   # Account for non-utf8 characters in header -> remove first line of byte-stream
-	dat.close()                                                                                         # Close socket connection
+		coords_str = coords_bytes.partition(b"\n")[2].decode("utf8", errors="replace")              # Account for non-utf8 characters in header -> remove first line of byte-stream
 
 	# PARSE AIRFOIL COORDINATES #
 	x = []                                                                                              # Initialise list of x-coordinates
@@ -69,4 +97,4 @@ def requestAirfoilCoordinates(code):
 		except ValueError:                                                                          # Catch ValueError and skip line (line contains non-coordinate content)
 			pass
 
-	return {"code": code, "x": x, "y": y}                                                               # Return dictionary of airfoil coordinates
\ No newline at end of file
+	return tuple(x), tuple(y)                                                                           # Return tuples of airfoil coordinates
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+This module contains a set of functions which persist the UIUC online Airfoil database
+to a local SQLite file, such that each airfoil is requested from the UIUC website only once.
+
+2 tables are created:
+airfoil_index -> code TEXT PRIMARY KEY, key TEXT: Airfoil code and its alphabetic key
+coords        -> code TEXT PRIMARY KEY, x BLOB, y BLOB: Airfoil code and its x,y coordinates (float64 bytes)
+"""
+
+# IMPORT EXTERNAL MODULES #
+import numpy as np
+import threading
+import sqlite3
+import os
+
+# IMPORT INTERNAL MODULES #
+import uiuc
+
+
+
+_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uiuc_cache.sqlite")                    # Local cache file next to this module
+_DB = None                                                                                                  # SQLite connection -> opened on first use
+_LOCK = threading.Lock()                                                                                    # Connection is shared between threads (e.g. uiuc_clone)
+
+
+
+# --- OPEN CONNECTION TO LOCAL CACHE AND CREATE TABLES --- #
+# @return -> sqlite3.Connection: Connection to local cache
+# N.B. Caller must hold @_LOCK
+def _connect():
+	global _DB
+	if _DB is None:
+		_DB = sqlite3.connect(_DB_PATH, check_same_thread=False)
+		_DB.execute("CREATE TABLE IF NOT EXISTS airfoil_index(code TEXT PRIMARY KEY, key TEXT)")
+		_DB.execute("CREATE TABLE IF NOT EXISTS coords(code TEXT PRIMARY KEY, x BLOB, y BLOB)")
+	return _DB
+
+
+
+# --- GENERATE A DICTIONARY/KEY/INDEX OF ALL AIRFOILS IN THE UIUC DATABASE --- #
+# @return -> Dictionary: Mapping from lowercase alphabetic char to list (of strings)
+#                        of all airfoils whose codes begin with that letter
+def requestAirfoilIndex():
+	with _LOCK:
+		rows = _connect().execute("SELECT key, code FROM airfoil_index ORDER BY rowid").fetchall()  # Cached index in original order
+
+	if not rows:                                                                                        # Cache miss -> GET index from UIUC website and store it
+		codes = uiuc.requestAirfoilIndex()
+		with _LOCK:
+			db = _connect()
+			db.executemany("INSERT OR REPLACE INTO airfoil_index VALUES (?, ?)",
+			               [(code, key) for key in codes for code in codes[key]])
+			db.commit()
+		return codes
+
+	codes = {}
+	for key, code in rows:                                                                              # Rebuild dictionary of airfoil codes
+		codes.setdefault(key, []).append(code)
+	return codes
+
+
+
+# --- SCRAPE AIRFOIL COORDINATES FROM LOCAL CACHE OR UIUC DATABASE --- #
+# @code    -> String: Airfoil Code
+# @return  -> Dictionary: Lists of airfoil x,y coordinates
+def requestAirfoilCoordinates(code):
+	with _LOCK:
+		row = _connect().execute("SELECT x, y FROM coords WHERE code = ?", (code,)).fetchone()
+	if row is not None:                                                                                 # Cache hit -> no HTTP request
+		return {"code": code, "x": np.frombuffer(row[0]).tolist(), "y": np.frombuffer(row[1]).tolist()}
+
+	doc = uiuc.requestAirfoilCoordinates(code)                                                          # Cache miss -> GET x,y coordinates from UIUC website
+	if doc:                                                                                             # Only store successful requests
+		with _LOCK:
+			db = _connect()
+			db.execute("INSERT OR REPLACE INTO coords VALUES (?, ?, ?)",
+			           (code, np.asarray(doc["x"], dtype=np.float64).tobytes(), np.asarray(doc["y"], dtype=np.float64).tobytes()))
+			db.commit()
+	return doc
+
+
+
+# --- LOAD ALL CACHED AIRFOIL COORDINATES --- #
+# @return -> Dictionary: Mapping from airfoil code to dictionary of airfoil x,y coordinates
+#                        (see requestAirfoilCoordinates) - single pass over local cache
+def loadAirfoilCoordinates():
+	with _LOCK:
+		rows = _connect().execute("SELECT code, x, y FROM coords").fetchall()
+	return {code: {"code": code, "x": np.frombuffer(x).tolist(), "y": np.frombuffer(y).tolist()} for code, x, y in rows}
@@ -5,6 +5,9 @@ online Airfoil database to a given MongoDB instance.
 27 distinct collections are created, one for each letter of the
 alphabet a,b,c,...,z and an additional one called "numeric".
 
+Airfoils already present in the local cache (see uiuc_cache) are not
+requested from the UIUC website again.
+
 Each airfoil is stored in a separate document with the following
 fields:
 _id  -> ObjectID
@@ -16,35 +19,44 @@ y    -> List:   Airfoil y-coordinates
 
 # IMPORT EXTERNAL MODULES #
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from concurrent.futures import ThreadPoolExecutor
 
 
 # IMPORT INTERNAL MODULES #
-import uiuc
+import uiuc_cache
 
 
 
 # --- CLONE UIUC AIRFOIL DATABASE TO GIVEN MONGODB INSTANCE --- #
-# @conn   -> String: connection string to MongoDB instance e.g. "mongodb://localhost:27017"
-# @dbname -> String: database name
-# @return -> None 
-def cloneDB(conn, dbname):
+# @conn        -> String:  connection string to MongoDB instance e.g. "mongodb://localhost:27017"
+# @dbname      -> String:  database name
+# @max_workers -> Integer: number of concurrent airfoil downloads
+# @return      -> None 
+def cloneDB(conn, dbname, max_workers=32):
 
 	client = MongoClient(conn)                                                                        # Connect to MongoDB instance
 	db = client[dbname]                                                                               # Create/use the Aerofoils database
 
-	index = uiuc.requestAirfoilIndex()                                                                # GET dictionary {letter: [airfoil-codes]} for all airfoils in UIUC online DB
+	index = uiuc_cache.requestAirfoilIndex()                                                          # GET dictionary {letter: [airfoil-codes]} for all airfoils in UIUC online DB (local cache first)
+	cached = uiuc_cache.loadAirfoilCoordinates()                                                      # Load all locally cached airfoils in a single pass -> no HTTP request
 	key_list = " | ".join(list(index.keys()))
 
-	for key in index.keys():                                                                          # Loop through alphabetic keys of @index dictionary
-		print("CURRENT KEY: ", key, " of ", key_list, "\n")
-		n = len(index[key])
-		i = 1
-		for code in index[key]:                                                                   # Loop through all airfoil codes starting with @key
-			doc = uiuc.requestAirfoilCoordinates(code)                                        # GET x,y coordinates of airfoil
-			db[key].insert_one(doc)                                                           # Insert x,y coordinates into MongoDB
-			print("SUCCESSFULLY STORED ", code, " to MongoDB...", 
-				  "(" + str(i) + "/" + str(n) + ")")
-			i += 1
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:                                     # Download is I/O-bound -> GET airfoils concurrently
+		for key in index.keys():                                                                  # Loop through alphabetic keys of @index dictionary
+			print("CURRENT KEY: ", key, " of ", key_list, "\n")
+			n = len(index[key])
+			missing = [code for code in index[key] if code not in cached]                     # Airfoils starting with @key which are not cached locally
+			fetched = dict(zip(missing, executor.map(uiuc_cache.requestAirfoilCoordinates, missing))) # GET x,y coordinates of missing airfoils (and cache them)
+			docs = [doc for doc in (cached.get(code) or fetched[code] for code in index[key]) if doc] # x,y coordinates of all airfoils starting with @key -> skip HTTP errors
+			if not docs:
+				continue
+			try:
+				n_stored = len(db[key].insert_many(docs, ordered=False).inserted_ids)     # Insert all x,y coordinates into MongoDB in a single batch
+			except BulkWriteError as error:                                                   # Tolerate failed writes (e.g. duplicates) -> remaining docs are still inserted
+				n_stored = error.details["nInserted"]
+			print("SUCCESSFULLY STORED ", key, " to MongoDB...", 
+				  "(" + str(n_stored) + "/" + str(n) + ")")
 
 
 